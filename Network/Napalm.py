@@ -1,24 +1,40 @@
-from napalm import get_network_driver
+from ncclient import manager
+from ncclient.operations import OperationError, RPCError
+from ncclient.transport.errors import TransportError
+import config_snapshot
+import napalm_pool
+
+host = '10.1.1.11'
+username = 'ccnp'
+password = 'cisco'
+# 830 포트를 응답 없이 막는 장비에서 오래 기다리지 않고 CLI로 넘어가도록
+NETCONF_TIMEOUT = 5
+
+# 보안 강화용: CBC 암호를 꺼서 AES-CTR로만 협상 (속도 향상은 없음)
+# CBC만 지원하는 오래된 IOS 장비는 이 옵션을 빼야 접속 가능
+optional_args = {
+    'disabled_algorithms': {
+        'ciphers': ['aes128-cbc', 'aes192-cbc', 'aes256-cbc', '3des-cbc'],
+    },
+}
+
+try:
+    # NETCONF(830)를 지원하는 장비(IOS-XE 16.6+, NX-OS)는 RPC 한 번으로 설정을 받음
+    with manager.connect(
+        host=host, port=830, username=username, password=password,
+        hostkey_verify=False, timeout=NETCONF_TIMEOUT,
+    ) as m:
+        config_xml = m.get_config(source='running').data_xml
+    with open(f'{host}.xml', 'w') as f:
+        f.write(config_xml)
+    print(f'running-config saved to {host}.xml (NETCONF)')
+except (TransportError, OperationError, RPCError, OSError):
+    # 지원하지 않으면 CLI 사용, 마지막 변경 시각이 같으면 캐시된 설정을 그대로 사용
+    with napalm_pool.lease(host, username, password, optional_args=optional_args) as device:
+        cfg_path = config_snapshot.sync_running_config(device.device, host)
+    print(f'running-config saved to {cfg_path} (CLI)')
+
+with napalm_pool.lease(host, username, password, optional_args=optional_args) as device:
+    interface = device.device.send_command('show interfaces')
 
-driver = get_network_driver('ios')
-device = driver(10'1'1'11', 'ccnp', 'cisco')
-device.open()
-
-config = device.get_config()
-
-device.close()
-
-print(config)
-
-
-
-
-from napalm import get_network_driver
-driver = get_network_driver('ios')
-device = driver(nostname='10.1.1.11', username='ccnp', password='cisco')
-device.open()
-interface = device.get_interfaces()
 print (interface)
-device.close()
-
-
@@ -0,0 +1,34 @@
+import asyncio
+from scrapli.driver.core import AsyncIOSXEDriver
+
+hosts = ['10.1.1.11', '10.1.1.21']
+MAX_CONNECTIONS = 50   # 동시에 열 수 있는 최대 세션 수
+
+
+async def fetch(host, sem):
+    async with sem:
+        async with AsyncIOSXEDriver(
+            host=host,
+            auth_username='ccnp',
+            auth_password='cisco',
+            auth_strict_key=False,
+            transport='asyncssh',
+        ) as d:
+            response = await d.send_command("show running-config")
+            return response.result
+
+
+async def main():
+    sem = asyncio.Semaphore(MAX_CONNECTIONS)
+    # 한 장비가 실패해도 나머지 장비의 결과는 유지
+    return await asyncio.gather(*(fetch(h, sem) for h in hosts), return_exceptions=True)
+
+
+configs = asyncio.run(main())
+
+for host, config in zip(hosts, configs):
+    print(host)
+    if isinstance(config, Exception):
+        print(f'failed: {config!r}')
+    else:
+        print(config)
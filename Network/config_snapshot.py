@@ -0,0 +1,61 @@
+"""Keep a local copy of each device's running-config and re-download it only when it changed."""
+import hashlib
+import os
+from ssh_dispather import stream_command
+
+CACHE_DIR = os.path.expanduser("~/.cache/napalm")
+# IOS rewrites this header line of the running-config on every configuration change
+LAST_CHANGE_CMD = "show running-config | include ^! Last configuration change"
+
+
+def _paths(host):
+    base = os.path.join(CACHE_DIR, host)
+    return base + ".cfg", base + ".sha"
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _last_change(path):
+    with open(path) as f:
+        for _, line in zip(range(20), f):
+            if line.startswith("! Last configuration change"):
+                return line.strip()
+    return ""
+
+
+def _cached_marker(host):
+    """Return the cached change marker, or None if the cache is missing or corrupt."""
+    cfg_path, sha_path = _paths(host)
+    try:
+        with open(sha_path) as f:
+            digest, marker = f.read().split("\n", 1)
+        if _sha256(cfg_path) != digest:
+            return None
+    except (OSError, ValueError):
+        return None
+    return marker.strip()
+
+
+def sync_running_config(conn, host):
+    """Return the path of an up-to-date copy of host's running-config.
+
+    Only the one-line change marker is read from the device when the cached copy is
+    still current. conn is a Netmiko connection (device.device for NAPALM's IOS driver).
+    """
+    cfg_path, sha_path = _paths(host)
+    marker = conn.send_command(LAST_CHANGE_CMD).strip()
+    if marker and marker == _cached_marker(host):
+        return cfg_path
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(cfg_path, "w") as f:
+        stream_command(conn, "show running-config", f)
+    with open(sha_path, "w") as f:
+        f.write(f"{_sha256(cfg_path)}\n{_last_change(cfg_path)}\n")
+    return cfg_path
@@ -0,0 +1,250 @@
+"""Process-wide pool of open NAPALM device handles, keyed by (host, port, user, platform)."""
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from napalm import get_network_driver
+from ssh_dispather import close_tunnel, control_master_tunnel, tune_socket
+
+IDLE_TIMEOUT = 300
+MAX_AGE = 3600
+MAX_POOL_SIZE = 100
+REAP_INTERVAL = 30
+
+
+class PooledConn:
+    """A pooled device handle and its bookkeeping.
+
+    in_use is a plain flag rather than a count because a handle is only ever leased
+    to one holder (see get_device()).
+    """
+
+    # One of these per open session, up to MAX_POOL_SIZE (more while all are leased);
+    # slots keep each entry small
+    __slots__ = (
+        "device",
+        "last_used",
+        "created_at",
+        "in_use",
+        "host",
+        "port",
+        "user",
+        "platform",
+    )
+
+    def __init__(self, device, host, port, user, platform):
+        self.device = device
+        self.last_used = self.created_at = time.monotonic()
+        self.in_use = False
+        self.host = host
+        self.port = port
+        self.user = user
+        self.platform = platform
+
+    @property
+    def key(self):
+        return (self.host, self.port, self.user, self.platform)
+
+
+# (host, port, user, platform) -> [PooledConn, ...]. Each handle is leased to at most
+# one holder at a time, so a key has one entry per concurrent user.
+_pool = {}
+_lock = threading.Lock()
+_reaper = None
+# platform -> NAPALM driver class; get_network_driver() scans entry points on every call
+_DRIVER_CACHE = {}
+
+
+def driver_for(platform):
+    """Return the NAPALM driver class for platform, looking it up only once."""
+    driver = _DRIVER_CACHE.get(platform)
+    if driver is None:
+        driver = _DRIVER_CACHE[platform] = get_network_driver(platform)
+    return driver
+
+
+def _close(device):
+    try:
+        device.close()
+    except Exception:
+        pass
+
+
+def _is_alive(device):
+    try:
+        return device.is_alive().get("is_alive", False)
+    except Exception:
+        return False
+
+
+def _start_reaper():
+    global _reaper
+    if _reaper is None:
+        _reaper = threading.Thread(target=_reap_forever, name="napalm-pool-reaper", daemon=True)
+        _reaper.start()
+
+
+def _reap_forever():
+    while True:
+        time.sleep(REAP_INTERVAL)
+        reap()
+
+
+def _remove(conn):
+    # Caller holds _lock
+    conns = _pool.get(conn.key, [])
+    if conn in conns:
+        conns.remove(conn)
+        if not conns:
+            del _pool[conn.key]
+
+
+def _find(device):
+    # Caller holds _lock
+    for conns in _pool.values():
+        for conn in conns:
+            if conn.device is device:
+                return conn
+    return None
+
+
+def _evict_idle():
+    """Drop least recently used idle handles until the pool fits MAX_POOL_SIZE.
+
+    Caller holds _lock; returns the devices to close once it is released.
+    """
+    evicted = []
+    idle = sorted(
+        (conn for conns in _pool.values() for conn in conns if not conn.in_use),
+        key=lambda conn: conn.last_used,
+    )
+    size = sum(len(conns) for conns in _pool.values())
+    for conn in idle:
+        if size <= MAX_POOL_SIZE:
+            break
+        _remove(conn)
+        evicted.append(conn.device)
+        size -= 1
+    return evicted
+
+
+def reap():
+    """Close idle handles unused for IDLE_TIMEOUT or older than MAX_AGE."""
+    now = time.monotonic()
+    expired = []
+    with _lock:
+        for conns in list(_pool.values()):
+            for conn in list(conns):
+                if conn.in_use:
+                    continue
+                if now - conn.last_used > IDLE_TIMEOUT or now - conn.created_at > MAX_AGE:
+                    _remove(conn)
+                    expired.append(conn.device)
+    for device in expired:
+        _close(device)
+
+
+def get_device(
+    host, user, pw, platform="ios", port=22, optional_args=None, use_control_master=False
+):
+    """Lease an open device handle for host, reusing an idle pooled one when available.
+
+    The handle belongs to the caller until it is handed back with release(); it is never
+    given to a second holder in the meantime, so concurrent or nested callers for the
+    same host get separate sessions. A pooled handle whose session has died is closed
+    and replaced.
+
+    optional_args and use_control_master only apply when a new session is opened; an
+    idle pooled handle for the same (host, port, user, platform) is reused as is.
+    With use_control_master the SSH session is tunnelled through an OpenSSH
+    ControlMaster (see ssh_dispather.control_master_sock).
+    """
+    key = (host, port, user, platform)
+    while True:
+        with _lock:
+            conn = next((c for c in _pool.get(key, []) if not c.in_use), None)
+            if conn is None:
+                break
+            conn.in_use = True
+        if _is_alive(conn.device):
+            conn.last_used = time.monotonic()
+            return conn.device
+        with _lock:
+            _remove(conn)
+        _close(conn.device)
+
+    optional_args = dict(optional_args or {})
+    optional_args.setdefault("port", port)
+    sock, owns_sock = control_master_tunnel(
+        host, port, optional_args.get("sock"), use_control_master
+    )
+    if owns_sock:
+        optional_args["sock"] = sock
+    driver = driver_for(platform)
+    try:
+        device = driver(hostname=host, username=user, password=pw, optional_args=optional_args)
+        device.open()
+    except Exception:
+        close_tunnel(sock, owns_sock)
+        raise
+    # Only the Netmiko-based drivers expose the underlying connection as .device
+    if hasattr(device, "device"):
+        tune_socket(device.device)
+
+    conn = PooledConn(device, host, port, user, platform)
+    conn.in_use = True
+    with _lock:
+        _pool.setdefault(key, []).append(conn)
+        evicted = _evict_idle()
+        _start_reaper()
+    for old_device in evicted:
+        _close(old_device)
+    return device
+
+
+def release(device, discard=False):
+    """Hand a device obtained from get_device() back to the pool.
+
+    With discard the handle is dropped from the pool and closed instead, e.g. after an
+    error left its session in an unknown state.
+    """
+    with _lock:
+        conn = _find(device)
+        if conn is not None:
+            if discard:
+                _remove(conn)
+            else:
+                conn.in_use = False
+                conn.last_used = time.monotonic()
+    if discard or conn is None:
+        _close(device)
+
+
+@contextmanager
+def lease(
+    host, user, pw, platform="ios", port=22, optional_args=None, use_control_master=False
+):
+    """Borrow a pooled device for the duration of a with-block.
+
+    Leaving the block returns the handle to the pool instead of closing it. A handle
+    whose block raised is discarded, since its session state is unknown.
+    """
+    device = get_device(host, user, pw, platform, port, optional_args, use_control_master)
+    ok = False
+    try:
+        yield device
+        ok = True
+    finally:
+        # Also runs for KeyboardInterrupt/SystemExit/GeneratorExit, so a handle is
+        # never left marked in use
+        release(device, discard=not ok)
+
+
+@atexit.register
+def close_all():
+    """Close every pooled handle."""
+    with _lock:
+        devices = [conn.device for conns in _pool.values() for conn in conns]
+        _pool.clear()
+    for device in devices:
+        _close(device)
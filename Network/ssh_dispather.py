@@ -1,79 +1,292 @@
 """Controls selection of proper class based on the device type."""
-from typing import Any, Type, Optional
+from __future__ import annotations
+
 from typing import TYPE_CHECKING
+import logging
+import os
 import re
+import shlex
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from importlib import import_module
+from paramiko import HostKeys, ProxyCommand
 from netmiko.exceptions import ConnectionException
 from netmiko.exceptions import NetmikoTimeoutException, NetmikoAuthenticationException
-from netmiko.a10 import A10SSH
-from netmiko.accedian import AccedianSSH
-from netmiko.adtran import AdtranOSSSH, AdtranOSTelnet
-from netmiko.adva import AdvaAosFsp150F3SSH, AdvaAosFsp150F2SSH
-from netmiko.alcatel import AlcatelAosSSH
-from netmiko.allied_telesis import AlliedTelesisAwplusSSH
-from netmiko.arista import AristaSSH, AristaTelnet
-from netmiko.arista import AristaFileTransfer
-from netmiko.arris import ArrisCERSSH
-from netmiko.apresia import ApresiaAeosSSH, ApresiaAeosTelnet
-from netmiko.aruba import ArubaSSH
-from netmiko.audiocode import (
-    Audiocode72SSH,
-    Audiocode66SSH,
-    AudiocodeShellSSH,
-    Audiocode72Telnet,
-    Audiocode66Telnet,
-    AudiocodeShellTelnet,
-)
-from netmiko.brocade import BrocadeFOSSSH
-from netmiko.broadcom import BroadcomIcosSSH
-from netmiko.calix import CalixB6SSH, CalixB6Telnet
-from netmiko.casa import CasaCMTSSSH
-from netmiko.cdot import CdotCrosSSH
-from netmiko.centec import CentecOSSSH, CentecOSTelnet
-from netmiko.checkpoint import CheckPointGaiaSSH
-from netmiko.ciena import CienaSaosSSH, CienaSaosTelnet, CienaSaosFileTransfer
-from netmiko.cisco import CiscoAsaSSH, CiscoAsaFileTransfer
-from netmiko.cisco import CiscoFtdSSH
-from netmiko.cisco import (
-    CiscoIosSSH,
-    CiscoIosFileTransfer,
-    CiscoIosTelnet,
-    CiscoIosSerial,
-)
-from netmiko.cisco import CiscoNxosSSH, CiscoNxosFileTransfer
-from netmiko.cisco import CiscoS200SSH, CiscoS200Telnet
-from netmiko.cisco import CiscoS300SSH, CiscoS300Telnet
-from netmiko.cisco import CiscoTpTcCeSSH
-from netmiko.cisco import CiscoViptelaSSH
-from netmiko.cisco import CiscoWlcSSH
-from netmiko.cisco import CiscoXrSSH, CiscoXrTelnet, CiscoXrFileTransfer
-from netmiko.citrix import NetscalerSSH
-from netmiko.cloudgenix import CloudGenixIonSSH
-from netmiko.coriant import CoriantSSH
-from netmiko.dell import DellDNOS6SSH
-from netmiko.dell import DellDNOS6Telnet
-from netmiko.dell import DellForce10SSH
-from netmiko.dell import DellOS10SSH, DellOS10FileTransfer
-from netmiko.dell import DellSonicSSH
-from netmiko.dell import DellPowerConnectSSH
-from netmiko.dell import DellPowerConnectTelnet
-from netmiko.dell import DellIsilonSSH
-from netmiko.digi import DigiTransportSSH
-from netmiko.dlink import DlinkDSTelnet, DlinkDSSSH
-from netmiko.eltex import EltexSSH, EltexEsrSSH
-from netmiko.endace import EndaceSSH
-from netmiko.enterasys import EnterasysSSH
-from netmiko.ericsson import (
-    EricssonIposSSH,
-    EricssonMinilink63SSH,
-    EricssonMinilink66SSH,
-)
-from netmiko.extreme import ExtremeErsSSH
-from netmiko.extreme import ExtremeExosSSH, ExtremeExosFileTransfer
-from netmiko.extreme import ExtremeExosTelnet
-from netmiko.extreme import ExtremeNetironSSH
-from netmiko.extreme import ExtremeNetironTelnet
-from netmiko.extreme import ExtremeNosSSH
-    if device_type not in platforms:
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, TextIO, Tuple, Type, Optional, Union
+    from netmiko.base_connection import BaseConnection
+    from netmiko.scp_handler import BaseFileTransfer
+
+# The keys of this dictionary are the supported device_types. Classes are given as
+# (module, class name) and only imported the first time a device_type is dispatched.
+CLASS_MAPPER_BASE = {
+    "a10": ("netmiko.a10", "A10SSH"),
+    "accedian": ("netmiko.accedian", "AccedianSSH"),
+    "adtran_os": ("netmiko.adtran", "AdtranOSSSH"),
+    "adva_fsp150f2": ("netmiko.adva", "AdvaAosFsp150F2SSH"),
+    "adva_fsp150f3": ("netmiko.adva", "AdvaAosFsp150F3SSH"),
+    "alcatel_aos": ("netmiko.alcatel", "AlcatelAosSSH"),
+    "allied_telesis_awplus": ("netmiko.allied_telesis", "AlliedTelesisAwplusSSH"),
+    "apresia_aeos": ("netmiko.apresia", "ApresiaAeosSSH"),
+    "arista_eos": ("netmiko.arista", "AristaSSH"),
+    "arris_cer": ("netmiko.arris", "ArrisCERSSH"),
+    "aruba_os": ("netmiko.aruba", "ArubaSSH"),
+    "audiocode_72": ("netmiko.audiocode", "Audiocode72SSH"),
+    "audiocode_66": ("netmiko.audiocode", "Audiocode66SSH"),
+    "audiocode_shell": ("netmiko.audiocode", "AudiocodeShellSSH"),
+    "avaya_ers": ("netmiko.extreme", "ExtremeErsSSH"),
+    "broadcom_icos": ("netmiko.broadcom", "BroadcomIcosSSH"),
+    "brocade_fos": ("netmiko.brocade", "BrocadeFOSSSH"),
+    "brocade_netiron": ("netmiko.extreme", "ExtremeNetironSSH"),
+    "brocade_nos": ("netmiko.extreme", "ExtremeNosSSH"),
+    "brocade_vdx": ("netmiko.extreme", "ExtremeNosSSH"),
+    "calix_b6": ("netmiko.calix", "CalixB6SSH"),
+    "casa_cmts": ("netmiko.casa", "CasaCMTSSSH"),
+    "cdot_cros": ("netmiko.cdot", "CdotCrosSSH"),
+    "centec_os": ("netmiko.centec", "CentecOSSSH"),
+    "ciena_saos": ("netmiko.ciena", "CienaSaosSSH"),
+    "checkpoint_gaia": ("netmiko.checkpoint", "CheckPointGaiaSSH"),
+    "cisco_asa": ("netmiko.cisco", "CiscoAsaSSH"),
+    "cisco_ftd": ("netmiko.cisco", "CiscoFtdSSH"),
+    "cisco_ios": ("netmiko.cisco", "CiscoIosSSH"),
+    "cisco_nxos": ("netmiko.cisco", "CiscoNxosSSH"),
+    "cisco_s200": ("netmiko.cisco", "CiscoS200SSH"),
+    "cisco_s300": ("netmiko.cisco", "CiscoS300SSH"),
+    "cisco_tp": ("netmiko.cisco", "CiscoTpTcCeSSH"),
+    "cisco_viptela": ("netmiko.cisco", "CiscoViptelaSSH"),
+    "cisco_wlc": ("netmiko.cisco", "CiscoWlcSSH"),
+    "cisco_xe": ("netmiko.cisco", "CiscoIosSSH"),
+    "cisco_xr": ("netmiko.cisco", "CiscoXrSSH"),
+    "cloudgenix_ion": ("netmiko.cloudgenix", "CloudGenixIonSSH"),
+    "coriant": ("netmiko.coriant", "CoriantSSH"),
+    "dell_dnos9": ("netmiko.dell", "DellForce10SSH"),
+    "dell_force10": ("netmiko.dell", "DellForce10SSH"),
+    "dell_os6": ("netmiko.dell", "DellDNOS6SSH"),
+    "dell_os9": ("netmiko.dell", "DellForce10SSH"),
+    "dell_os10": ("netmiko.dell", "DellOS10SSH"),
+    "dell_sonic": ("netmiko.dell", "DellSonicSSH"),
+    "dell_powerconnect": ("netmiko.dell", "DellPowerConnectSSH"),
+    "dell_isilon": ("netmiko.dell", "DellIsilonSSH"),
+    "dlink_ds": ("netmiko.dlink", "DlinkDSSSH"),
+    "digi_transport": ("netmiko.digi", "DigiTransportSSH"),
+    "endace": ("netmiko.endace", "EndaceSSH"),
+    "eltex": ("netmiko.eltex", "EltexSSH"),
+    "eltex_esr": ("netmiko.eltex", "EltexEsrSSH"),
+    "enterasys": ("netmiko.enterasys", "EnterasysSSH"),
+    "ericsson_ipos": ("netmiko.ericsson", "EricssonIposSSH"),
+    "ericsson_mltn63": ("netmiko.ericsson", "EricssonMinilink63SSH"),
+    "ericsson_mltn66": ("netmiko.ericsson", "EricssonMinilink66SSH"),
+    "extreme": ("netmiko.extreme", "ExtremeExosSSH"),
+    "extreme_ers": ("netmiko.extreme", "ExtremeErsSSH"),
+    "extreme_exos": ("netmiko.extreme", "ExtremeExosSSH"),
+    "extreme_netiron": ("netmiko.extreme", "ExtremeNetironSSH"),
+    "extreme_nos": ("netmiko.extreme", "ExtremeNosSSH"),
+}
+
+FILE_TRANSFER_MAP = {
+    "arista_eos": ("netmiko.arista", "AristaFileTransfer"),
+    "ciena_saos": ("netmiko.ciena", "CienaSaosFileTransfer"),
+    "cisco_asa": ("netmiko.cisco", "CiscoAsaFileTransfer"),
+    "cisco_ios": ("netmiko.cisco", "CiscoIosFileTransfer"),
+    "cisco_nxos": ("netmiko.cisco", "CiscoNxosFileTransfer"),
+    "cisco_xe": ("netmiko.cisco", "CiscoIosFileTransfer"),
+    "cisco_xr": ("netmiko.cisco", "CiscoXrFileTransfer"),
+    "dell_os10": ("netmiko.dell", "DellOS10FileTransfer"),
+    "extreme_exos": ("netmiko.extreme", "ExtremeExosFileTransfer"),
+}
+
+# Also support keys that end in _ssh
+new_mapper = {}
+for k, v in CLASS_MAPPER_BASE.items():
+    new_mapper[k] = v
+    alt_key = k + "_ssh"
+    new_mapper[alt_key] = v
+CLASS_MAPPER = new_mapper
+
+new_mapper = {}
+for k, v in FILE_TRANSFER_MAP.items():
+    new_mapper[k] = v
+    alt_key = k + "_ssh"
+    new_mapper[alt_key] = v
+FILE_TRANSFER_MAP = new_mapper
+
+# Add telnet drivers
+CLASS_MAPPER["adtran_os_telnet"] = ("netmiko.adtran", "AdtranOSTelnet")
+CLASS_MAPPER["apresia_aeos_telnet"] = ("netmiko.apresia", "ApresiaAeosTelnet")
+CLASS_MAPPER["arista_eos_telnet"] = ("netmiko.arista", "AristaTelnet")
+CLASS_MAPPER["audiocode_72_telnet"] = ("netmiko.audiocode", "Audiocode72Telnet")
+CLASS_MAPPER["audiocode_66_telnet"] = ("netmiko.audiocode", "Audiocode66Telnet")
+CLASS_MAPPER["audiocode_shell_telnet"] = ("netmiko.audiocode", "AudiocodeShellTelnet")
+CLASS_MAPPER["calix_b6_telnet"] = ("netmiko.calix", "CalixB6Telnet")
+CLASS_MAPPER["centec_os_telnet"] = ("netmiko.centec", "CentecOSTelnet")
+CLASS_MAPPER["ciena_saos_telnet"] = ("netmiko.ciena", "CienaSaosTelnet")
+CLASS_MAPPER["cisco_ios_telnet"] = ("netmiko.cisco", "CiscoIosTelnet")
+CLASS_MAPPER["cisco_xr_telnet"] = ("netmiko.cisco", "CiscoXrTelnet")
+CLASS_MAPPER["cisco_s200_telnet"] = ("netmiko.cisco", "CiscoS200Telnet")
+CLASS_MAPPER["cisco_s300_telnet"] = ("netmiko.cisco", "CiscoS300Telnet")
+CLASS_MAPPER["dell_dnos6_telnet"] = ("netmiko.dell", "DellDNOS6Telnet")
+CLASS_MAPPER["dell_powerconnect_telnet"] = ("netmiko.dell", "DellPowerConnectTelnet")
+CLASS_MAPPER["dlink_ds_telnet"] = ("netmiko.dlink", "DlinkDSTelnet")
+CLASS_MAPPER["extreme_telnet"] = ("netmiko.extreme", "ExtremeExosTelnet")
+CLASS_MAPPER["extreme_exos_telnet"] = ("netmiko.extreme", "ExtremeExosTelnet")
+CLASS_MAPPER["extreme_netiron_telnet"] = ("netmiko.extreme", "ExtremeNetironTelnet")
+CLASS_MAPPER["cisco_ios_serial"] = ("netmiko.cisco", "CiscoIosSerial")
+
+platforms = list(CLASS_MAPPER.keys())
+platforms.sort()
+platforms_base = list(CLASS_MAPPER_BASE.keys())
+platforms_base.sort()
+platforms_str = "\n".join(platforms_base)
+platforms_str = "\n" + platforms_str
+
+scp_platforms = list(FILE_TRANSFER_MAP.keys())
+scp_platforms.sort()
+scp_platforms_str = "\n".join(scp_platforms)
+scp_platforms_str = "\n" + scp_platforms_str
+
+telnet_platforms = [x for x in platforms if "telnet" in x]
+telnet_platforms_str = "\n".join(telnet_platforms)
+telnet_platforms_str = "\n" + telnet_platforms_str
+
+PLATFORMS_SET = frozenset(CLASS_MAPPER)
+PLATFORMS_BASE_SET = frozenset(CLASS_MAPPER_BASE)
+
+_DEFAULT_LOGGER = logging.getLogger(__name__)
+# log files ConnLogOnly has already passed to logging.basicConfig()
+_CONFIGURED_LOGS = set()
+
+# ~/.ssh/known_hosts, parsed on the first connection made with system_host_keys=True
+# and then shared by all of them instead of being re-read per connection
+_SYSTEM_HOST_KEYS = None
+_SYSTEM_HOST_KEYS_LOCK = threading.Lock()
+
+TCP_KEEPIDLE = 30
+TCP_KEEPINTVL = 10
+TCP_KEEPCNT = 3
+
+CONTROL_PATH = "/tmp/nm_%r@%h:%p"
+CONTROL_PERSIST = 60
+
+
+def control_master_sock(
+    host: str, port: int = 22, jump_host: str = "localhost"
+) -> ProxyCommand:
+    """Return a socket-like object tunnelled through an OpenSSH ControlMaster session.
+
+    The first call starts a master connection to jump_host; later calls within
+    CONTROL_PERSIST seconds multiplex over it instead of opening a new TCP/SSH session.
+    """
+    command = [
+        "ssh",
+        "-o",
+        "ControlMaster=auto",
+        "-o",
+        f"ControlPath={CONTROL_PATH}",
+        "-o",
+        f"ControlPersist={CONTROL_PERSIST}",
+        "-W",
+        f"{host}:{port}",
+        jump_host,
+    ]
+    return ProxyCommand(shlex.join(command))
+
+
+def control_master_tunnel(
+    host: str,
+    port: int,
+    sock: Any = None,
+    use_control_master: bool = False,
+    jump_host: str = "localhost",
+    device_type: Optional[str] = None,
+) -> Tuple[Any, bool]:
+    """Decide which socket a connection should use; return (sock, owns_sock).
+
+    A ControlMaster tunnel is only started when use_control_master is set, the
+    caller did not pass its own sock and device_type is SSH based (telnet and
+    serial drivers never use sock). owns_sock is True only for a tunnel started
+    here, which the caller must hand to close_tunnel() if connecting fails.
+    """
+    if not use_control_master or sock is not None:
+        return sock, False
+    if device_type is not None and device_type.endswith(("_telnet", "_serial")):
+        return sock, False
+    return control_master_sock(host, port, jump_host), True
+
+
+def close_tunnel(sock: Any, owns_sock: bool) -> None:
+    """Stop the 'ssh -W' child of a tunnel from control_master_tunnel(), if we own it."""
+    if owns_sock:
+        sock.close()
+
+
+def tune_socket(net_connect: "BaseConnection") -> None:
+    """Disable Nagle and enable TCP keepalive on an open connection's socket.
+
+    Connections that are not backed by a real TCP socket (serial, ProxyCommand)
+    are left alone.
+    """
+    remote_conn = getattr(net_connect, "remote_conn", None)
+    if hasattr(remote_conn, "get_transport"):
+        sock = remote_conn.get_transport().sock
+    else:
+        sock = getattr(remote_conn, "sock", None)
+    if not isinstance(sock, socket.socket):
+        return
+
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    # Linux only
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, TCP_KEEPIDLE)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, TCP_KEEPINTVL)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, TCP_KEEPCNT)
+
+
+def _system_host_keys() -> HostKeys:
+    global _SYSTEM_HOST_KEYS
+    with _SYSTEM_HOST_KEYS_LOCK:
+        if _SYSTEM_HOST_KEYS is None:
+            host_keys = HostKeys()
+            try:
+                host_keys.load(os.path.expanduser("~/.ssh/known_hosts"))
+            except IOError:
+                pass
+            _SYSTEM_HOST_KEYS = host_keys
+    return _SYSTEM_HOST_KEYS
+
+
+def _share_system_host_keys(net_connect: "BaseConnection") -> None:
+    """Make net_connect's Paramiko client use the shared system host keys.
+
+    This relies on two private hooks: Netmiko's _build_ssh_client() and Paramiko's
+    SSHClient._system_host_keys. net_connect.system_host_keys is only cleared while
+    the client is built, so that Netmiko skips its own load_system_host_keys() call.
+    """
+    build_ssh_client = net_connect._build_ssh_client
+
+    def _build_ssh_client() -> Any:
+        net_connect.system_host_keys = False
+        try:
+            remote_conn_pre = build_ssh_client()
+        finally:
+            net_connect.system_host_keys = True
+        # Paramiko never writes to the system host keys, so one copy can be shared
+        remote_conn_pre._system_host_keys = _system_host_keys()
+        return remote_conn_pre
+
+    net_connect._build_ssh_client = _build_ssh_client
+
+
+def ConnectHandler(*args: Any, **kwargs: Any) -> "BaseConnection":
+    """Factory function selects the proper class and creates object based on device_type."""
+    device_type = kwargs["device_type"]
+    use_control_master = kwargs.pop("use_control_master", False)
+    control_master_host = kwargs.pop("control_master_host", "localhost")
+    if device_type not in PLATFORMS_SET:
         if device_type is None:
             msg_str = platforms_str
         else:
@@ -83,7 +296,32 @@ from netmiko.extreme import ExtremeNosSSH
             "currently supported platforms are: {}".format(msg_str)
         )
     ConnectionClass = ssh_dispatcher(device_type)
-    return ConnectionClass(*args, **kwargs)
+    sock, owns_sock = control_master_tunnel(
+        kwargs.get("host") or kwargs.get("ip"),
+        kwargs.get("port") or 22,
+        kwargs.get("sock"),
+        use_control_master,
+        control_master_host,
+        device_type,
+    )
+    if owns_sock:
+        kwargs["sock"] = sock
+    auto_connect = kwargs.get("auto_connect", True)
+    try:
+        if kwargs.get("system_host_keys"):
+            kwargs["auto_connect"] = False
+            net_connect = ConnectionClass(*args, **kwargs)
+            _share_system_host_keys(net_connect)
+            if auto_connect:
+                net_connect._open()
+        else:
+            net_connect = ConnectionClass(*args, **kwargs)
+    except Exception:
+        close_tunnel(sock, owns_sock)
+        raise
+    if auto_connect:
+        tune_socket(net_connect)
+    return net_connect
 
 
 def TelnetFallback(*args: Any, **kwargs: Any) -> "BaseConnection":
@@ -92,14 +330,19 @@ def TelnetFallback(*args: Any, **kwargs: Any) -> "BaseConnection":
         return ConnectHandler(*args, **kwargs)
     except (NetmikoTimeoutException, ConnectionRefusedError):
         device_type = kwargs["device_type"]
-        # platforms_str is the base form (i.e. does not have the '_ssh' suffix)
-        if device_type in platforms_str:
+        # PLATFORMS_BASE_SET is the base form (i.e. does not have the '_ssh' suffix)
+        if device_type in PLATFORMS_BASE_SET:
             alternative_device = f"{device_type}_telnet"
-        elif "_ssh" in device_type:
-            alternative_device = re.sub("_ssh", "_telnet", device_type)
+        elif device_type.endswith("_ssh"):
+            alternative_device = device_type[:-4] + "_telnet"
+        else:
+            raise
 
-        if alternative_device in platforms:
+        if alternative_device in PLATFORMS_SET:
             kwargs["device_type"] = alternative_device
+            # The ControlMaster tunnel is SSH only
+            kwargs.pop("use_control_master", None)
+            kwargs.pop("control_master_host", None)
             return ConnectHandler(*args, **kwargs)
         raise
 
@@ -117,24 +360,28 @@ def ConnLogOnly(
     all errors should be logged.
     """
 
-    import logging
-
-    if log_level is None:
-        log_level = logging.ERROR
-    if log_format is None:
-        log_format = "%(asctime)s %(levelname)s %(name)s %(message)s"
+    if log_file not in _CONFIGURED_LOGS:
+        if log_level is None:
+            log_level = logging.ERROR
+        if log_format is None:
+            log_format = "%(asctime)s %(levelname)s %(name)s %(message)s"
+        logging.basicConfig(filename=log_file, level=log_level, format=log_format)
+        _CONFIGURED_LOGS.add(log_file)
+    logger = _DEFAULT_LOGGER
 
-    logging.basicConfig(filename=log_file, level=log_level, format=log_format)
-    logger = logging.getLogger(__name__)
+    # Used by the error messages below even if ConnectHandler() itself fails
+    hostname = kwargs.get("host") or kwargs.get("ip")
+    port = kwargs.get("port", 22)
+    device_type = kwargs.get("device_type")
 
     try:
-        kwargs["auto_connect"] = False
+        # ConnectHandler connects, tunes the socket and cleans up a ControlMaster
+        # tunnel it started if connecting fails
+        kwargs["auto_connect"] = True
         net_connect = ConnectHandler(**kwargs)
         hostname = net_connect.host
         port = net_connect.port
-        device_type = net_connect.device_type
 
-        net_connect._open()
         msg = f"Netmiko connection succesful to {hostname}:{port}"
         logger.info(msg)
         return net_connect
@@ -163,16 +410,14 @@ def ConnLogOnly(
 def ConnUnify(
     **kwargs: Any,
 ) -> "BaseConnection":
-    try:
-        kwargs["auto_connect"] = False
-        net_connect = ConnectHandler(**kwargs)
-        hostname = net_connect.host
-        port = net_connect.port
-        device_type = net_connect.device_type
-        general_msg = f"Connection failure to {hostname}:{port} ({device_type})\n\n"
+    hostname = kwargs.get("host") or kwargs.get("ip")
+    port = kwargs.get("port", 22)
+    device_type = kwargs.get("device_type")
+    general_msg = f"Connection failure to {hostname}:{port} ({device_type})\n\n"
 
-        net_connect._open()
-        return net_connect
+    try:
+        kwargs["auto_connect"] = True
+        return ConnectHandler(**kwargs)
     except NetmikoAuthenticationException as e:
         msg = general_msg + str(e)
         raise ConnectionException(msg)
@@ -184,9 +429,128 @@ def ConnUnify(
         raise ConnectionException(msg)
 
 
+def send_batch(
+    conn: "BaseConnection",
+    cmds: List[str],
+    prompt_re: Optional[str] = None,
+    read_timeout: float = 30.0,
+) -> List[str]:
+    """Send several show commands in one write and split the combined output per command.
+
+    Paging must be disabled on the device (Netmiko does this during session preparation).
+    """
+    if prompt_re is None:
+        prompt_re = re.escape(conn.find_prompt())
+    trailing_prompt = re.compile(rf"(?:{prompt_re})\s*$")
+
+    conn.write_channel(conn.RETURN.join(cmds) + conn.RETURN)
+    outputs = []
+    for cmd in cmds:
+        # Each chunk is the echoed command, its output and the next prompt
+        chunk = conn.read_until_pattern(pattern=prompt_re, read_timeout=read_timeout)
+        lines = trailing_prompt.sub("", chunk).splitlines()
+        if lines and cmd in lines[0]:
+            lines = lines[1:]
+        outputs.append("\n".join(lines))
+    return outputs
+
+
+def stream_command(
+    conn: "BaseConnection",
+    command: str,
+    fh: TextIO,
+    prompt_re: Optional[str] = None,
+    read_timeout: float = 120.0,
+) -> None:
+    """Write the output of command to fh as it arrives instead of building one string.
+
+    The echoed command and the trailing prompt are not written.
+    """
+    if prompt_re is None:
+        prompt_re = re.escape(conn.find_prompt())
+    prompt = re.compile(prompt_re)
+    # Hold back enough unwritten output to catch a prompt split across two reads
+    tail = 256
+
+    conn.write_channel(command + conn.RETURN)
+    pending = ""
+    # Line-break characters at the end of a read; they may be the first half of a
+    # '\r\n' pair and are only normalized together with the next read
+    carry = ""
+    echo_seen = False
+    deadline = time.monotonic() + read_timeout
+    while True:
+        data = conn.read_channel()
+        if not data:
+            if time.monotonic() > deadline:
+                raise NetmikoTimeoutException(
+                    f"Timed out reading the output of {command!r} after {read_timeout}s"
+                )
+            time.sleep(0.05)
+            continue
+        data = carry + data
+        raw = data.rstrip("\r\n")
+        carry = data[len(raw) :]
+        pending += conn.normalize_linefeeds(raw)
+        if not echo_seen:
+            if "\n" not in pending:
+                continue
+            pending = pending.split("\n", 1)[1]
+            echo_seen = True
+        match = prompt.search(pending)
+        if match:
+            fh.write(pending[: match.start()])
+            return
+        if len(pending) > tail:
+            fh.write(pending[:-tail])
+            pending = pending[-tail:]
+
+
+def _run(device: Dict[str, Any], commands: List[str]) -> List[str]:
+    net_connect = ConnectHandler(**device)
+    try:
+        return send_batch(net_connect, commands)
+    finally:
+        net_connect.disconnect()
+
+
+def dispatch_many(
+    hosts: List[Dict[str, Any]], commands: List[str], max_workers: int = 50
+) -> List[Union[List[str], Exception]]:
+    """Run the same commands on many devices concurrently, one connection per thread.
+
+    Each entry of hosts is a ConnectHandler kwargs dict. The result has one item per
+    host, in the same order as hosts: the list of command outputs (one string per
+    command) or, if that host failed, the exception it raised. A failing host does
+    not affect the others.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        futures = [ex.submit(_run, h, commands) for h in hosts]
+    results: List[Union[List[str], Exception]] = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+@lru_cache(maxsize=None)
+def _import_class(module: str, class_name: str) -> type:
+    return getattr(import_module(module), class_name)
+
+
+@lru_cache(maxsize=None)
 def ssh_dispatcher(device_type: str) -> Type["BaseConnection"]:
     """Select the class to be instantiated based on vendor/platform."""
-    return CLASS_MAPPER[device_type]
+    try:
+        module, class_name = CLASS_MAPPER[device_type]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported 'device_type' {device_type!r} "
+            f"currently supported platforms are: {platforms_str}"
+        ) from None
+    return _import_class(module, class_name)
 
 
 def redispatch(
@@ -209,11 +573,13 @@ def FileTransfer(*args: Any, **kwargs: Any) -> "BaseFileTransfer":
         device_type = args[0].device_type
     else:
         device_type = kwargs["ssh_conn"].device_type
-    if device_type not in scp_platforms:
+    try:
+        module, class_name = FILE_TRANSFER_MAP[device_type]
+    except KeyError:
         raise ValueError(
             "Unsupported SCP device_type: "
             "currently supported platforms are: {}".format(scp_platforms_str)
-        )
+        ) from None
     FileTransferClass: Type["BaseFileTransfer"]
-    FileTransferClass = FILE_TRANSFER_MAP[device_type]
+    FileTransferClass = _import_class(module, class_name)
     return FileTransferClass(*args, **kwargs)